@@ -1,22 +1,37 @@
 #!/usr/bin/env python3
 
+from typing import Any
+
+
 class BasePyPIxzProException(Exception):
     """Base exception for PyPIxz-PRO."""
     
-    def __init__(self, *args, details: None = None):
+    __slots__ = ("details",)
+    
+    def __init__(self, *args, details: Any = None):
         """Initialize the exception with optional additional arguments."""
         
         self.details = details
         super().__init__(*args)
+    
+    def __reduce__(self):
+        """Keep the details when pickled, slots aren't part of the default exception state."""
+        
+        return self.__class__, self.args, {**vars(self), "details": self.details}
         
 
 # Exception for dependency management and package installation
 class DependencyError(BasePyPIxzProException):
     """Exception raised when a dependency cannot be installed."""
     
+    __slots__ = ()
+    
 class MissingRequirementsFileError(DependencyError):
     """Exception raised when a requirements file is missing."""
     
+    __slots__ = ()
+    
 class ModuleInstallationError(DependencyError):
     """Exception raised when a module cannot be installed."""
-    
\ No newline at end of file
+    
+    __slots__ = ()
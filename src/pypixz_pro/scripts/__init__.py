@@ -0,0 +1,3 @@
+#!/usr/bin/env python3
+
+""" Installation helpers of PyPIxz-PRO, exposed through the `pypixz_pro` package. """
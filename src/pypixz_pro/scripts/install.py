@@ -1,10 +1,20 @@
 #!/usr/bin/env python3
 
+import codecs
 import os
 import logging
-import subprocess
+import re
+import site
+import stat
 import sys
 
+from functools import lru_cache
+from pathlib import Path
+from typing import Union
+
+# subprocess, importlib.metadata and packaging are imported where they are used, 
+# so `import pypixz_pro` stays cheap for programs that never install anything
+
 from ..exceptions import (
     MissingRequirementsFileError,
     ModuleInstallationError,
@@ -12,17 +22,347 @@ from ..exceptions import (
 )
 
 
-def install_requirements(path: str = "requirements.txt", logger: str = "main"):
+_LOG = logging.getLogger(__name__)
+
+# Installed packages per environment state, see `_get_installed_packages`
+_PKG_CACHE = {}
+
+# Runs of "-", "_" and "." are equivalent in distribution names (PEP 503)
+_NAME_SEPARATORS = re.compile(r"[-_.]+")
+
+# A requirement without version specifier, extras, marker or URL
+_BARE_NAME = re.compile(r"[A-Za-z0-9][A-Za-z0-9._-]*")
+
+# The single-byte line boundaries of str.splitlines(), which pip uses to split requirements files
+_LINE_BREAKS = rb"\n\r\x0b\x0c\x1c-\x1e"
+
+# The content of a requirements file line, without blank lines, comment lines and inline comments 
+# (like pip, "#" starts an inline comment only when preceded by whitespace), nor UTF-8 BOM. 
+# Every other line matches, whatever its line ending, so none is silently skipped by the preflight
+_REQUIREMENT_LINE = re.compile(
+    rb"(?:^|(?<=[" + _LINE_BREAKS + rb"]))(?:\xef\xbb\xbf)?[ \t]*(?!\xef\xbb\xbf)"
+    rb"([^\s#" + _LINE_BREAKS + rb"](?:[^" + _LINE_BREAKS + rb"]*?[^\s" + _LINE_BREAKS + rb"])?)"
+    rb"[ \t]*(?:[ \t]#[^" + _LINE_BREAKS + rb"]*)?(?=[" + _LINE_BREAKS + rb"]|\Z)"
+)
+
+# The only requirements file options that install something on their own
+_INSTALLING_OPTIONS = ("-r", "--requirement", "-e", "--editable")
+
+# Requirements files from this size are memory-mapped instead of read
+_MMAP_THRESHOLD = 1024 * 1024
+
+# Byte order marks of the encodings that must be converted to UTF-8 before the scan, 
+# e.g. "pip freeze > requirements.txt" writes UTF-16 in Windows PowerShell (UTF-32 first, it starts like UTF-16)
+_WIDE_BOMS = (
+    (codecs.BOM_UTF32_LE, "utf-32"),
+    (codecs.BOM_UTF32_BE, "utf-32"),
+    (codecs.BOM_UTF16_LE, "utf-16"),
+    (codecs.BOM_UTF16_BE, "utf-16")
+)
+
+# Isolated mode (-I) skips the user site-packages and the PYTHON* environment variables at pip startup, 
+# only used when this interpreter doesn't rely on them either so pip sees the same packages and settings
+if site.ENABLE_USER_SITE or any(variable.startswith("PYTHON") for variable in os.environ):
+    _PIP_COMMAND = (sys.executable, "-m", "pip")
+else:
+    _PIP_COMMAND = (sys.executable, "-I", "-m", "pip")
+
+
+def _get_logger(logger: Union[logging.Logger, str, None]) -> logging.Logger:
+    """_get_logger Normalize the logger given to the public functions.
+
+    Arguments:
+        logger {logging.Logger | str | None} -- A logger instance, a logger name or None for the module logger.
+
+    Returns:
+        logging.Logger -- The logger to use.
+    """
+    
+    if isinstance(logger, logging.Logger):
+        return logger
+    
+    return logging.getLogger(logger) if logger else _LOG
+
+
+def _site_packages_key() -> tuple:
+    """_site_packages_key Build a key describing the current state of the directories holding distributions.
+
+    Installing or removing a distribution adds or deletes a `*.dist-info` entry, 
+    which updates the modification time of its directory. Every `sys.path` entry is covered 
+    (PYTHONPATH, `pip --target` directories, `.pth` files, runtime additions) since they are all scanned.
+
+    Returns:
+        tuple -- The interpreter prefix, the `sys.path` entries and their modification times.
+    """
+    
+    directories = tuple(sys.path)
+    
+    mtimes = []
+    for directory in directories:
+        try:
+            mtimes.append(os.stat(directory or ".").st_mtime_ns)
+        except OSError:
+            mtimes.append(None)  # e.g. directory not created yet
+    
+    return (sys.prefix, directories, tuple(mtimes))
+
+
+@lru_cache(maxsize=None)
+def _load_packaging():
+    """_load_packaging Import the optional `packaging` requirement parser on first use.
+
+    Returns:
+        tuple -- The `Requirement` class and the errors it can raise, or None if `packaging` isn't installed.
+    """
+    
+    try:
+        from packaging.markers import UndefinedEnvironmentName
+        from packaging.requirements import InvalidRequirement, Requirement
+        from packaging.version import InvalidVersion
+    except ImportError:
+        # Optional, without it only bare names and "==" pins can be checked
+        return None
+    
+    return Requirement, (InvalidRequirement, InvalidVersion, UndefinedEnvironmentName)
+
+
+def _canonicalize_name(name: str) -> str:
+    """_canonicalize_name Normalize a distribution name so that "Foo_Bar" and "foo-bar" match.
+
+    Arguments:
+        name {str} -- The distribution name.
+
+    Returns:
+        str -- The normalized name (PEP 503).
+    """
+    
+    return _NAME_SEPARATORS.sub("-", name).lower()
+
+
+def _get_installed_packages() -> dict:
+    """_get_installed_packages Map every distribution installed in the current environment to its version.
+
+    The metadata is read directly from the `*.dist-info` directories found on `sys.path`, 
+    so no `pip` subprocess has to be spawned to know what is already installed. 
+    The result is cached until a `sys.path` directory changes or an installation succeeds.
+
+    Returns:
+        dict -- Normalized distribution names mapped to their installed version.
+    """
+    
+    cache_key = _site_packages_key()
+    if cache_key in _PKG_CACHE:
+        return _PKG_CACHE[cache_key]
+    
+    from importlib import metadata
+    
+    installed_packages = {}
+    
+    for distribution in metadata.distributions():
+        name = distribution.metadata["Name"]
+        
+        # Skip broken installations without a name
+        if name:
+            installed_packages.setdefault(_canonicalize_name(name), distribution.version)
+    
+    _PKG_CACHE.clear()
+    _PKG_CACHE[cache_key] = installed_packages
+    
+    return installed_packages
+
+
+def _extract_requirements(content) -> list:
+    """_extract_requirements Extract the requirement lines of a requirements file content.
+
+    Arguments:
+        content {bytes | mmap} -- The raw content of the file, UTF-8 or starting with a UTF-16/32 BOM.
+
+    Raises:
+        UnicodeError: If the content can't be decoded.
+
+    Returns:
+        list -- The requirement lines, without comments and blank lines.
+
+    Examples:
+        >>> _extract_requirements(b"requests\\rnumpy-not-installed\\r")
+        ['requests', 'numpy-not-installed']
+        >>> _extract_requirements(b"requests\\nnotinstalled\\x0c\\n")
+        ['requests', 'notinstalled']
+    """
+    
+    for bom, encoding in _WIDE_BOMS:
+        if content[:len(bom)] == bom:
+            content = bytes(content).decode(encoding).encode("utf-8")
+            break
+    
+    # NUL bytes mean a wide encoding without BOM, not something to scan as UTF-8
+    if content.find(b"\0") != -1:
+        raise UnicodeError("NUL byte in the requirements file")
+    
+    return [match.group(1).decode("utf-8") for match in _REQUIREMENT_LINE.finditer(content)]
+
+
+def _read_requirements(file, size: int) -> Union[list, None]:
+    """_read_requirements Extract the requirement lines of an open requirements file.
+
+    Small files are read at once, large generated lockfiles are scanned in place through `mmap` 
+    so their content is never copied into memory.
+
+    Arguments:
+        file {BinaryIO} -- The requirements file, opened in binary mode.
+        size {int} -- The size of the file in bytes.
+
+    Returns:
+        list | None -- The requirement lines, without comments and blank lines, None if the file can't be decoded.
+    """
+    
+    try:
+        if size < _MMAP_THRESHOLD:
+            return _extract_requirements(file.read())
+        
+        import mmap
+        
+        with mmap.mmap(file.fileno(), 0, access=mmap.ACCESS_READ) as content:
+            return _extract_requirements(content)
+    except UnicodeError:
+        return None
+
+
+def _lookup_installed_packages(package_lines: list) -> dict:
+    """_lookup_installed_packages Get the installed packages needed to check some requirement lines.
+
+    When every line is a bare name and nothing is cached yet, each distribution is looked up by name 
+    instead of scanning all the installed distributions.
+
+    Arguments:
+        package_lines {list} -- The requirement lines to check.
+
+    Returns:
+        dict -- Normalized distribution names mapped to their installed version.
+    """
+    
+    if _PKG_CACHE or not all(_BARE_NAME.fullmatch(line) for line in package_lines):
+        return _get_installed_packages()
+    
+    from importlib import metadata
+    
+    installed_packages = {}
+    
+    for name in package_lines:
+        try:
+            installed_packages[_canonicalize_name(name)] = metadata.version(name)
+        except metadata.PackageNotFoundError:
+            continue
+    
+    return installed_packages
+
+
+def _is_package_installed(package_line: str, installed_packages: dict) -> bool:
+    """_is_package_installed Check if a requirement line is already satisfied.
+
+    When `packaging` is available, PEP 508 requirements (specifiers, markers) are evaluated, 
+    requirements with extras are left to `pip` since their own dependencies aren't checked. 
+    Otherwise only bare names and exact `==` pins can be verified. 
+    Anything that cannot be verified is considered as not installed so that `pip` gets the final word.
+
+    Arguments:
+        package_line {str} -- A requirement line, e.g. "requests>=2.32.5".
+        installed_packages {dict} -- The installed packages returned by `_get_installed_packages`.
+
+    Returns:
+        bool -- True if the requirement is already satisfied.
+    """
+    
+    packaging_classes = _load_packaging()
+    
+    if packaging_classes is not None:
+        Requirement, packaging_errors = packaging_classes
+        
+        try:
+            requirement = Requirement(package_line)
+            
+            # A requirement whose marker doesn't match this environment needs nothing
+            if requirement.marker is not None and not requirement.marker.evaluate():
+                return True
+            
+            installed_version = installed_packages.get(_canonicalize_name(requirement.name))
+            if installed_version is None or requirement.url or requirement.extras:
+                return False
+            
+            # Same as pip, an installed pre-release satisfies a matching specifier
+            return requirement.specifier.contains(installed_version, prereleases=True)
+        except packaging_errors:
+            # Options, paths, non PEP 440 installed versions, "extra" markers...
+            return False
+    
+    name, separator, required_version = package_line.partition("==")
+    if separator:
+        # "===" (arbitrary equality) is a plain string comparison as well
+        return installed_packages.get(_canonicalize_name(name.strip())) == required_version.lstrip("=").strip()
+    
+    if any(operator in package_line for operator in "<>!~=;@[ "):
+        return False
+    
+    return _canonicalize_name(package_line) in installed_packages
+
+
+def _run_pip(command: list, logger: logging.Logger):
+    """_run_pip Run a pip command and forward its output to the logger as it is produced.
+
+    The standard output is logged line by line at the debug level instead of being buffered until pip exits. 
+    Only the last lines of the error output are kept to build the error message.
+
+    Arguments:
+        command {list} -- The full pip command to execute.
+        logger {logging.Logger} -- The logger receiving the pip output.
+
+    Raises:
+        subprocess.CalledProcessError: If pip exits with a non-zero return code.
+    """
+    
+    import locale
+    import subprocess
+    import threading
+    
+    from collections import deque
+    
+    stderr_tail = deque(maxlen=200)
+    
+    with subprocess.Popen(
+        command,
+        stdout=subprocess.PIPE,
+        stderr=subprocess.PIPE,
+        # pip writes with the locale encoding, a mismatching byte must not stop the logging
+        encoding=locale.getpreferredencoding(False),
+        errors="replace",
+        bufsize=1  # Line buffered, each line is logged as soon as pip writes it
+    ) as process:
+        # Drain stderr in the background so a chatty pip can't fill the pipe and block
+        stderr_reader = threading.Thread(target=stderr_tail.extend, args=(process.stderr,), daemon=True)
+        stderr_reader.start()
+        
+        for line in process.stdout:
+            logger.debug(line.rstrip())
+        
+        stderr_reader.join()
+    
+    if process.returncode:
+        raise subprocess.CalledProcessError(process.returncode, command, stderr="".join(stderr_tail))
+
+
+def install_requirements(path: str = "requirements.txt", logger: Union[logging.Logger, str, None] = "main", cache_dir: str = None):
     """install_requirements Install required Python packages from a requirements file.
 
     This function enables the installation of Python package dependencies defined in a requirements file. 
-    It first checks the file's existence before validating if all required packages are already installed. 
-    If some packages aren't installed, it executes `pip` to install the missing dependencies. 
+    It first checks the file's existence before validating if all required packages are already installed, 
+    reading the installed distributions in-process instead of spawning `pip`. 
+    If some packages aren't installed, it executes `pip` once on the requirements file. 
     The function includes optional logging features to record status, success, or error messages.
 
     Keyword Arguments:
         path {str} -- The path to the requirements file. (default: {"requirements"})
-        logger {str} -- Choose the logger used (default: {"main"})
+        logger {logging.Logger | str | None} -- Choose the logger used, by instance or by name, None for the module logger (default: {"main"})
+        cache_dir {str} -- Directory used by pip to cache downloads and built wheels, pip's own cache if None. (default: {None})
 
     Raises:
         MissingRequirementsFileError: If the specified requirements file does not exist or cannot be accessed.
@@ -30,36 +370,77 @@ def install_requirements(path: str = "requirements.txt", logger: str = "main"):
         DependencyError: If an OS-level error occurs during the installation process.
     """
     
-    absolute_path = os.path.abspath(path)
-    logger = logging.getLogger(logger)
+    import subprocess
     
-    # Check if the file exists and is valid
-    if not os.path.isfile(absolute_path):
-        raise MissingRequirementsFileError(logger.error(f"The {path} file was not found."))
+    logger = _get_logger(logger)
+    
+    # Opening the file is the existence check, no separate stat on the path. 
+    # O_NONBLOCK keeps a FIFO from blocking the open before it can be rejected below
+    try:
+        descriptor = os.open(path, os.O_RDONLY | getattr(os, "O_NONBLOCK", 0) | getattr(os, "O_BINARY", 0))
+    except OSError as os_error:
+        message = f"The {path} file could not be opened: {os_error.strerror or os_error}."
+        logger.error(message)
+        raise MissingRequirementsFileError(message) from os_error
+    
+    # Directories, FIFOs and devices aren't requirements files
+    file_stat = os.fstat(descriptor)
+    if not stat.S_ISREG(file_stat.st_mode):
+        os.close(descriptor)
+        message = f"The {path} file is not a regular file."
+        logger.error(message)
+        raise MissingRequirementsFileError(message)
+    
+    # A single regex pass over the whole file instead of a Python loop per line
+    with os.fdopen(descriptor, "rb") as file:
+        required_packages = _read_requirements(file, file_stat.st_size)
+    
+    # Skip pip entirely when every requirement is already satisfied, 
+    # an undecodable file is left to pip and its own encoding detection
+    if required_packages is not None:
+        installed_packages = _lookup_installed_packages(required_packages)
+        packages_to_install = [
+            package for package in required_packages
+            # Global options (index URLs, constraints...) alone would make pip run for nothing
+            if (not package.startswith("-") or package.startswith(_INSTALLING_OPTIONS))
+            and not _is_package_installed(package, installed_packages)
+        ]
+        
+        if not packages_to_install:
+            logger.info("All dependencies are already installed.")
+            return
+    
+    # Pip reads the file itself so that options, hashes and ${VAR} expansion keep working, 
+    # absolute() only joins the current directory, unlike resolve() it doesn't stat every component
+    install_arguments = ["-r", str(Path(path).absolute())]
+    
+    # Keep pip's wheel cache so later runs don't download and build everything again
+    if cache_dir:
+        install_arguments = [f"--cache-dir={cache_dir}", *install_arguments]
     
     try:
         # Run the pip install -r requirements.txt command
-        result = subprocess.run(
-            [sys.executable, "-m", "pip", "install", "-r", absolute_path],
-            check=True,  # Raises CalledProcessError if the command fails
-            capture_output=True,  # Captures stdout and stderr for debugging/logging
-            text=True  # Decodes stdout/stderr as text
-        )
+        _run_pip([*_PIP_COMMAND, "install", *install_arguments], logger)
         
+        _PKG_CACHE.clear()
         logger.info("Successfully installed dependencies.")
-        logger.debug("Command output:\n%s", result.stdout)
     
     except subprocess.CalledProcessError as error:
-        raise ModuleInstallationError(logger.error(f"An error occurred while installing dependencies:\n{error.stderr or 'Unknown error'}")) from error
+        message = f"An error occurred while installing dependencies:\n{error.stderr or 'Unknown error'}"
+        logger.error(message)
+        raise ModuleInstallationError(message) from error
     except OSError as os_error:
-        raise DependencyError(logger.error(f"OS error occurred during installation: {os_error}")) from os_error
+        message = f"OS error occurred during installation: {os_error}"
+        logger.error(message)
+        raise DependencyError(message) from os_error
     
 
-def install_modules(module: str, version: str = None, version_range: str = None, logger: str = "main") -> bool:
+def install_modules(module: str, version: str = None, version_range: str = None, logger: Union[logging.Logger, str, None] = "main", cache_dir: str = None) -> bool:
     """install_modules Install a specified Python module with optional version, version range, and logging.
 
     This function allows for installing a Python module from PyPI, with the option to specify a specific version, version range, or using the latest available version. 
     It supports logging for debugging purposes and handles various error scenarios like dependency issues or installation failure.
+    If the installed distributions already satisfy the request, `pip` is not called at all.
 
     Arguments:
         module {str} -- The name of the module to be installed.
@@ -67,7 +448,8 @@ def install_modules(module: str, version: str = None, version_range: str = None,
     Keyword Arguments:
         version {str} -- The specific version of the module to be installed. Defaults to None. (default: {None})
         version_range {str} -- A version range specifier if a specific range of versions is needed. (default: {None})
-        logger {str} -- Choose the logger used (default: {"main"})
+        logger {logging.Logger | str | None} -- Choose the logger used, by instance or by name, None for the module logger (default: {"main"})
+        cache_dir {str} -- Directory used by pip to cache downloads and built wheels, pip's own cache if None. (default: {None})
 
     Raises:
         ModuleInstallationError: Raised when the module installation fails due to system issues, dependency issues, or other reasons.
@@ -84,28 +466,39 @@ def install_modules(module: str, version: str = None, version_range: str = None,
         package_specifier = f"{module}{version_range}"  # e.g. "module>=1.2.0, !=2.0.0"
     else:
         package_specifier = module  # Latest version installed by default
+    
+    import subprocess
+    
+    logger = _get_logger(logger)
+    
+    # Pip would not touch an already satisfied module, so don't pay for its startup
+    if _is_package_installed(package_specifier, _lookup_installed_packages([package_specifier])):
+        logger.info(f"Module {module} is already installed.")
+        return True
         
     try:
 
         # Pip command with specifier
         command = [
-            sys.executable, "-m", "pip", "install", package_specifier
+            *_PIP_COMMAND, "install", package_specifier
         ]
+        
+        if cache_dir:
+            command.append(f"--cache-dir={cache_dir}")
 
         # Call pip install
-        result = subprocess.run(
-            command,
-            check=True,  # Raises CalledProcessError if the command fails
-            capture_output=True,  # Captures stdout and stderr for debugging/logging
-            text=True  # Decodes stdout/stderr as text
-        )
+        _run_pip(command, logger)
 
+        _PKG_CACHE.clear()
         logger.info(f"Module {module} successfully installed.")
-        logger.debug("Command output:\n%s", result.stdout)
 
     except subprocess.CalledProcessError as error:
-        raise ModuleInstallationError(logger.error(f"An error occurred while installing the module {module}:\n{error.stderr or 'Unknown error'}")) from error
+        message = f"An error occurred while installing the module {module}:\n{error.stderr or 'Unknown error'}"
+        logger.error(message)
+        raise ModuleInstallationError(message) from error
     except (OSError, DependencyError) as dep_error:
-        raise ModuleInstallationError(logger.error(f"System or dependency error for the module {module}: {dep_error}")) from dep_error
+        message = f"System or dependency error for the module {module}: {dep_error}"
+        logger.error(message)
+        raise ModuleInstallationError(message) from dep_error
     
     return True